@@ -0,0 +1,49 @@
+# _kernels.py
+# Numba JIT 커널 모음 (Numba 미설치 시 HAVE_NUMBA=False, 호출측에서 NumPy 경로 사용)
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+if HAVE_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _map_ptt(r_idx, ppg_idx, fs, lo=0.0, hi=1.5):
+        # r_idx, ppg_idx 모두 정렬되어 있으므로 공유 커서 j로 한 번에 병합 탐색
+        out = np.empty(r_idx.size, dtype=np.float64)
+        n_ppg = ppg_idx.size
+        j = 0
+        k = 0
+        for i in range(r_idx.size):
+            r = r_idx[i]
+            while j < n_ppg and ppg_idx[j] < r:
+                j += 1
+            if j >= n_ppg:
+                break
+            ptt = (ppg_idx[j] - r) / fs
+            if lo < ptt < hi:
+                out[k] = ptt
+                k += 1
+        return out[:k]
+
+    @njit(cache=True, fastmath=True)
+    def _zscore_inplace(x):
+        # Welford: 평균/분산을 한 번의 순회로 계산 후 같은 배열에 정규화 결과 기록
+        n = x.size
+        m = 0.0
+        s = 0.0
+        for i in range(n):
+            d = x[i] - m
+            m += d / (i + 1)
+            s += d * (x[i] - m)
+        std = np.sqrt(s / n) if n > 0 else 0.0
+        inv = 1.0 / std if std > 1e-12 else 1.0
+        for i in range(n):
+            x[i] = (x[i] - m) * inv
+        return x
+else:
+    _map_ptt = None
+    _zscore_inplace = None
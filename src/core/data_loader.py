@@ -4,13 +4,21 @@ import pandas as pd
 from scipy.io import loadmat
 from typing import Optional, Tuple, Dict, Any
 
+try:
+    import pyarrow  # noqa: F401  (설치되어 있으면 멀티스레드 CSV 파서 사용)
+    _CSV_ENGINE = "pyarrow"
+except ImportError:
+    _CSV_ENGINE = "c"
+
 class DataLoader:
     """
     - MAT: ppg/ecg 키 자동 탐색, fs(또는 sampling_rate) 자동 인식
+      (v7.3/HDF5 파일은 h5py로 필요한 데이터셋만 읽음)
     - CSV: 열 이름 자동 추정(ppg, ecg, time/fs), 샘플링레이트 추정
+      (time_range 지정 시 해당 구간 행만 읽는 부분 로드)
     - API:
         load_mat(path, ppg_key?, ecg_key?, fs_key?) -> (t, ppg, ecg, fs)
-        load_csv(path, time_col?, ppg_col?, ecg_col?, fs?) -> (t, ppg, ecg, fs)
+        load_csv(path, time_col?, ppg_col?, ecg_col?, fs?, time_range?) -> (t, ppg, ecg, fs)
         generate_dummy(duration=10, fs=128)
     """
     def __init__(self, default_fs: float = 128.0):
@@ -22,7 +30,8 @@ class DataLoader:
     # ---------- helpers ----------
     @staticmethod
     def _flatten_if_needed(x: Any) -> np.ndarray:
-        arr = np.array(x).astype(float).squeeze()
+        # PPG/ECG 동적 범위는 float32로 충분 (메모리 대역폭 절반)
+        arr = np.array(x).astype(np.float32).squeeze()
         return arr.ravel()
 
     @staticmethod
@@ -38,21 +47,20 @@ class DataLoader:
         return None
 
     # ---------- MAT ----------
-    def load_mat(
-        self,
-        mat_path: str,
-        ppg_key: Optional[str] = None,
-        ecg_key: Optional[str] = None,
-        fs_key: Optional[str] = None
-    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
-        try:
-            mdict = loadmat(mat_path)
-        except Exception as e:
-            raise RuntimeError(f"MAT 파일 로드 실패: {e}")
-
-        # remove meta keys
-        data_keys = {k: v for k, v in mdict.items() if not k.startswith("__")}
+    @staticmethod
+    def _is_mat_v73(mat_path: str) -> bool:
+        # v7.3 MAT은 HDF5 컨테이너 (128바이트 텍스트 헤더에 'MATLAB 7.3' / 'HDF5' 표기)
+        with open(mat_path, "rb") as f:
+            magic = f.read(128)
+        return b"HDF5" in magic or b"MATLAB 7.3" in magic
 
+    def _pick_mat_signals(
+        self,
+        data_keys: Dict[str, Any],
+        ppg_key: Optional[str],
+        ecg_key: Optional[str],
+        fs_key: Optional[str]
+    ) -> Tuple[np.ndarray, np.ndarray, Optional[float]]:
         # find keys
         ppg_key = ppg_key or self._find_first_key(
             data_keys, ["ppg_raw", "ppg", "PPG", "ppgSignal", "ppg_signal"]
@@ -67,11 +75,48 @@ class DataLoader:
         if ppg_key is None or ecg_key is None:
             raise RuntimeError(f"MAT 내부에 PPG/ECG 키를 찾지 못했습니다. 키 후보를 지정하세요. (keys={list(data_keys.keys())[:10]}...)")
 
+        # h5py Dataset은 여기서 필요한 키만 디스크에서 읽힘
         ppg = self._flatten_if_needed(data_keys[ppg_key])
         ecg = self._flatten_if_needed(data_keys[ecg_key])
+        fs_val = float(np.array(data_keys[fs_key]).squeeze()) if fs_key is not None else None
+        return ppg, ecg, fs_val
+
+    def load_mat(
+        self,
+        mat_path: str,
+        ppg_key: Optional[str] = None,
+        ecg_key: Optional[str] = None,
+        fs_key: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        try:
+            is_v73 = self._is_mat_v73(mat_path)
+        except OSError as e:
+            raise RuntimeError(f"MAT 파일 로드 실패: {e}")
 
-        if fs_key is not None:
-            fs_val = float(np.array(data_keys[fs_key]).squeeze())
+        if is_v73:
+            try:
+                import h5py
+            except ImportError:
+                raise RuntimeError("MAT v7.3(HDF5) 파일을 읽으려면 h5py가 필요합니다. (pip install h5py)")
+            try:
+                f = h5py.File(mat_path, "r")
+            except Exception as e:
+                raise RuntimeError(f"MAT 파일 로드 실패: {e}")
+            with f:
+                # '#refs#' 등 메타 그룹 제외, 데이터셋만 (lazy)
+                data_keys = {k: v for k, v in f.items() if not k.startswith("#") and isinstance(v, h5py.Dataset)}
+                ppg, ecg, fs_val = self._pick_mat_signals(data_keys, ppg_key, ecg_key, fs_key)
+        else:
+            try:
+                mdict = loadmat(mat_path, squeeze_me=True, simplify_cells=True)
+            except Exception as e:
+                raise RuntimeError(f"MAT 파일 로드 실패: {e}")
+
+            # remove meta keys
+            data_keys = {k: v for k, v in mdict.items() if not k.startswith("__")}
+            ppg, ecg, fs_val = self._pick_mat_signals(data_keys, ppg_key, ecg_key, fs_key)
+
+        if fs_val is not None:
             self.sampling_rate = fs_val
         else:
             # fallback 기존 기본값
@@ -85,21 +130,45 @@ class DataLoader:
         return t, ppg, ecg, self.sampling_rate
 
     # ---------- CSV ----------
+    def _csv_row_window(
+        self,
+        csv_path: str,
+        time_col: Optional[str],
+        fs: Optional[float],
+        time_range: Tuple[float, float]
+    ) -> Tuple[int, int]:
+        # [t0, t1) 구간에 해당하는 (시작 행, 행 개수) 계산
+        t0, t1 = time_range
+        if t1 <= t0:
+            raise RuntimeError("time_range 종료시간이 시작시간보다 커야 합니다.")
+        if time_col is not None:
+            # 1st pass: time 열만 읽어서 행 인덱스 결정
+            t_all = pd.read_csv(csv_path, usecols=[time_col], engine=_CSV_ENGINE)[time_col].to_numpy(dtype=float)
+            s = int(np.searchsorted(t_all, t0, side="left"))
+            e = int(np.searchsorted(t_all, t1, side="left"))
+        else:
+            fs = fs or self.sampling_rate
+            s = max(0, int(t0 * fs))
+            e = int(t1 * fs)
+        return s, max(0, e - s)
+
     def load_csv(
         self,
         csv_path: str,
         time_col: Optional[str] = None,
         ppg_col: Optional[str] = None,
         ecg_col: Optional[str] = None,
-        fs: Optional[float] = None
+        fs: Optional[float] = None,
+        time_range: Optional[Tuple[float, float]] = None
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
         try:
-            df = pd.read_csv(csv_path)
+            # 헤더만 먼저 읽어서 필요한 열을 결정
+            columns = list(pd.read_csv(csv_path, nrows=0).columns)
         except Exception as e:
             raise RuntimeError(f"CSV 파일 로드 실패: {e}")
 
-        cols = [c.lower() for c in df.columns]
-        colmap = {c.lower(): c for c in df.columns}
+        cols = [c.lower() for c in columns]
+        colmap = {c.lower(): c for c in columns}
 
         # guess columns
         if time_col is None:
@@ -118,10 +187,30 @@ class DataLoader:
                     ecg_col = colmap[c]; break
 
         if ppg_col is None or ecg_col is None:
-            raise RuntimeError(f"CSV에서 PPG/ECG 열을 찾지 못했습니다. (columns={list(df.columns)})")
+            raise RuntimeError(f"CSV에서 PPG/ECG 열을 찾지 못했습니다. (columns={columns})")
+
+        usecols = [c for c in (time_col, ppg_col, ecg_col) if c is not None]
+        row_offset = 0
+        try:
+            if time_range is None:
+                df = pd.read_csv(csv_path, usecols=usecols, engine=_CSV_ENGINE)
+            else:
+                # 2nd pass: 구간 행만 읽음 (pyarrow 엔진은 nrows 미지원 → C 엔진)
+                row_offset, nrows = self._csv_row_window(csv_path, time_col, fs, time_range)
+                df = pd.read_csv(
+                    csv_path, header=None, names=columns, usecols=usecols,
+                    skiprows=row_offset + 1, nrows=nrows
+                )
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"CSV 파일 로드 실패: {e}")
+
+        if time_range is not None and len(df) == 0:
+            raise RuntimeError(f"CSV 지정 구간에 데이터가 없습니다. (time_range={time_range})")
 
-        ppg = df[ppg_col].to_numpy(dtype=float)
-        ecg = df[ecg_col].to_numpy(dtype=float)
+        ppg = df[ppg_col].to_numpy(dtype=np.float32)
+        ecg = df[ecg_col].to_numpy(dtype=np.float32)
         n = min(len(ppg), len(ecg))
         ppg, ecg = ppg[:n], ecg[:n]
 
@@ -129,12 +218,18 @@ class DataLoader:
             t_raw = df[time_col].to_numpy(dtype=float)[:n]
             # infer fs
             if fs is None and len(t_raw) > 2:
-                dt = np.median(np.diff(t_raw))
+                # 균일 샘플링이면 (끝-처음)/(N-1)이 정확(O(1)), 지터가 크면 median으로 fallback
+                dt_lin = (t_raw[-1] - t_raw[0]) / (len(t_raw) - 1)
+                sample = np.diff(t_raw[::max(1, len(t_raw) // 1024)])
+                if dt_lin > 0 and sample.max() - sample.min() < 0.1 * dt_lin:
+                    dt = float(dt_lin)
+                else:
+                    dt = float(np.median(np.diff(t_raw)))
                 if dt > 0:
                     fs = 1.0 / dt
         else:
             fs = fs or self.sampling_rate
-            t_raw = np.arange(n) / fs
+            t_raw = (row_offset + np.arange(n)) / fs
 
         self.sampling_rate = fs or self.sampling_rate
         self.ppg, self.ecg, self.t = ppg, ecg, t_raw
@@ -144,10 +239,29 @@ class DataLoader:
     def generate_dummy(self, duration: int = 10, fs: Optional[float] = None):
         fs = fs or self.sampling_rate
         t = np.linspace(0, duration, int(duration * fs), endpoint=False)
-        # 간단한 합성 파형
-        ppg = 0.6*np.sin(2*np.pi*1.2*t) + 0.3*np.sin(2*np.pi*2.4*t) + 0.05*np.random.randn(len(t))
+        # 간단한 합성 파형 (임시 배열 하나를 재사용하는 in-place 연산)
+        omega = 2*np.pi
+        buf = np.empty(t.size, dtype=np.float32)
+        np.multiply(t, omega*1.2, out=buf)
+        ppg = np.sin(buf)
+        ppg *= 0.6
+        np.multiply(t, omega*2.4, out=buf)
+        np.sin(buf, out=buf)
+        buf *= 0.3
+        ppg += buf
+        noise = np.random.randn(t.size)
+        noise *= 0.05
+        ppg += noise
         # ECG는 위상차와 날카로운 R-peak 유사형
-        ecg = 0.4*np.sin(2*np.pi*1.0*t + 0.4) + 0.6*(np.mod(t*1.0, 1) < 0.02).astype(float) + 0.05*np.random.randn(len(t))
+        np.multiply(t, omega*1.0, out=buf)
+        buf += 0.4
+        ecg = np.sin(buf)
+        ecg *= 0.4
+        np.mod(t, 1.0, out=buf)
+        ecg[buf < 0.02] += 0.6
+        noise = np.random.randn(t.size)
+        noise *= 0.05
+        ecg += noise
         self.t, self.ppg, self.ecg = t, ppg, ecg
         self.sampling_rate = fs
         return t, ppg, ecg, fs
@@ -1,8 +1,36 @@
 # sync_analyzer.py
+import logging
 import numpy as np
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Tuple, Dict, Optional
-from scipy.signal import butter, filtfilt, find_peaks, resample_poly, detrend as sp_detrend
+from scipy.signal import (
+    butter, sosfilt, sosfiltfilt, find_peaks, resample_poly, detrend as sp_detrend,
+    correlate, correlation_lags
+)
+
+from _kernels import HAVE_NUMBA, _map_ptt, _zscore_inplace
+
+# 이보다 짧은 배열은 Numba 호출 오버헤드가 더 커서 NumPy 경로 사용
+_ZSCORE_JIT_MIN = 4096
+
+logger = logging.getLogger(__name__)
+_detrend_skip_logged = False
+
+
+def _log_detrend_skip_once():
+    global _detrend_skip_logged
+    if not _detrend_skip_logged:
+        _detrend_skip_logged = True
+        logger.info("bandpass high-pass 차단이 추세를 제거하므로 필터링되는 신호의 detrend는 생략합니다.")
+
+
+@lru_cache(maxsize=32)
+def _design_sos(order: int, low: float, high: float, fs: float) -> np.ndarray:
+    # fs/차단주파수는 거의 바뀌지 않으므로 필터 설계 결과를 캐시
+    nyq = 0.5 * fs
+    return butter(order, [low / nyq, high / nyq], btype="band", output="sos")
+
 
 @dataclass
 class ROIResult:
@@ -17,17 +45,29 @@ class ROIResult:
     ptt_sd_s: Optional[float]
     delay_xcorr_s: Optional[float]
     sqi: Dict[str, float]
+    # ROI 로컬 인덱스 (필터링된 신호 기준 피크, 표시용으로 재사용)
+    ppg_peaks: Optional[np.ndarray] = None
+    ecg_peaks: Optional[np.ndarray] = None
 
 class SyncAnalyzer:
-    def __init__(self, sampling_rate: float = 128.0):
+    def __init__(self, sampling_rate: float = 128.0, dtype=np.float32):
         self.sampling_rate = sampling_rate
+        # 신호 처리 dtype (float32: 메모리 대역폭 절반, z-score/xcorr/SQI 정밀도 충분)
+        self.dtype = np.dtype(dtype)
         self.roi_start = None
         self.roi_end = None
+        # 신호 배열 첫 샘플의 시각 (부분 로드/타임스탬프 CSV는 0이 아닐 수 있음)
+        self.time_origin = 0.0
+        # analyze_roi 내부 중간 결과용 scratch 버퍼 (다음 호출에서 덮어씀, 외부로 반환하지 않음)
+        self._buf: Dict[str, np.ndarray] = {}
 
     # ----------------- config -----------------
     def set_sampling_rate(self, fs: float):
         self.sampling_rate = float(fs)
 
+    def set_time_origin(self, t0: float):
+        self.time_origin = float(t0)
+
     def set_roi(self, start_time: float, end_time: float):
         if end_time <= start_time:
             raise ValueError("ROI 종료시간이 시작시간보다 커야 합니다.")
@@ -38,30 +78,74 @@ class SyncAnalyzer:
     def extract_roi(self, signal: np.ndarray) -> np.ndarray:
         if self.roi_start is None or self.roi_end is None:
             raise ValueError("ROI가 설정되지 않았습니다.")
-        start_idx = int(self.roi_start * self.sampling_rate)
-        end_idx = int(self.roi_end * self.sampling_rate)
-        start_idx = max(0, start_idx)
-        end_idx = min(len(signal), end_idx)
+        start_idx = int((self.roi_start - self.time_origin) * self.sampling_rate)
+        end_idx = int((self.roi_end - self.time_origin) * self.sampling_rate)
+        # 두 경계 모두 [0, len] 안으로 (ROI가 데이터 앞/뒤에 있으면 음수 인덱스가 되지 않도록)
+        start_idx = max(0, min(len(signal), start_idx))
+        end_idx = max(start_idx, min(len(signal), end_idx))
+        if end_idx <= start_idx:
+            raise ValueError("ROI가 데이터 범위를 벗어났습니다.")
+        # 복사 없이 view 반환
         return signal[start_idx:end_idx]
 
+    def _get_buf(self, name: str, size: int, dtype) -> np.ndarray:
+        # 용량이 충분하면 기존 버퍼 재사용 (ROI 드래그 중 반복 할당 방지), 증가 시 25% 여유
+        dtype = np.dtype(dtype)
+        buf = self._buf.get(name)
+        if buf is None or buf.size < size or buf.dtype != dtype:
+            buf = np.empty(size + size // 4, dtype=dtype)
+            self._buf[name] = buf
+        return buf[:size]
+
     def align_signals(self, ppg: np.ndarray, ecg: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         min_len = min(len(ppg), len(ecg))
         return ppg[:min_len], ecg[:min_len]
 
     # ----------------- filters -----------------
     def bandpass(self, x: np.ndarray, low: float, high: float, order: int = 4) -> np.ndarray:
-        nyq = 0.5 * self.sampling_rate
-        lowc = low / nyq
-        highc = high / nyq
-        b, a = butter(order, [lowc, highc], btype="band")
-        return filtfilt(b, a, x)
+        sos = _design_sos(int(order), float(low), float(high), float(self.sampling_rate))
+        # sosfiltfilt 기본 padlen 이하의 짧은 ROI는 패딩 없이 정/역방향 sosfilt
+        ntaps = 2 * len(sos) + 1 - min(int((sos[:, 2] == 0).sum()), int((sos[:, 5] == 0).sum()))
+        if len(x) <= 3 * ntaps:
+            y = sosfilt(sos, sosfilt(sos, x)[::-1])[::-1]
+        else:
+            y = sosfiltfilt(sos, x)
+        # 계수는 float64 유지 (저역 차단 극점이 단위원에 가까움), 결과만 self.dtype으로
+        return y.astype(self.dtype, copy=False)
 
     def detrend(self, x: np.ndarray) -> np.ndarray:
         return sp_detrend(x)
 
+    def _detrend_into(self, x: np.ndarray, name: str) -> np.ndarray:
+        # scratch 버퍼에 복사 후 in-place detrend
+        # 최소제곱 추세 추정은 큰 DC 오프셋에서도 정확하도록 float64 (이후 단계에서 self.dtype으로 변환)
+        out = self._get_buf(name, x.size, np.float64)
+        np.copyto(out, x, casting="same_kind")
+        return sp_detrend(out, type="linear", overwrite_data=True)
+
     def zscore(self, x: np.ndarray) -> np.ndarray:
-        s = np.std(x)
-        return (x - np.mean(x)) / (s if s > 1e-12 else 1.0)
+        x = np.asarray(x, dtype=self.dtype)
+        if HAVE_NUMBA and x.size > _ZSCORE_JIT_MIN and x.dtype.kind == "f":
+            # Welford 커널로 평균/분산 한 번에 (입력은 보존, 복사본에 in-place)
+            return _zscore_inplace(np.array(x, copy=True))
+        # 나눗셈 대신 역수 곱 (원소당 연산 1회 절약)
+        # 통계량은 float64로 누적, 출력은 self.dtype (Python float 스칼라라서 dtype 승격 없음)
+        m = float(x.mean(dtype=np.float64))
+        s = float(x.std(dtype=np.float64))
+        return (x - m) * (1.0 / (s if s > 1e-12 else 1.0))
+
+    def _zscore_into(self, x: np.ndarray, name: str) -> np.ndarray:
+        # zscore와 동일, 결과를 scratch 버퍼에 기록
+        x = np.asarray(x)
+        out = self._get_buf(name, x.size, self.dtype)
+        if HAVE_NUMBA and x.size > _ZSCORE_JIT_MIN:
+            np.copyto(out, x, casting="same_kind")
+            return _zscore_inplace(out)
+        m = float(x.mean(dtype=np.float64))
+        s = float(x.std(dtype=np.float64))
+        np.subtract(x, m, out=out, casting="same_kind")
+        out *= 1.0 / (s if s > 1e-12 else 1.0)
+        return out
 
     def resample_to(self, x: np.ndarray, orig_fs: float, target_fs: float) -> Tuple[np.ndarray, float]:
         if abs(orig_fs - target_fs) < 1e-6:
@@ -78,13 +162,19 @@ class SyncAnalyzer:
     # ----------------- peaks & metrics -----------------
     def detect_ecg_rpeaks(self, ecg_f: np.ndarray) -> np.ndarray:
         # 간단: z-score + peak prominence
-        z = self.zscore(ecg_f)
-        peaks, _ = find_peaks(z, distance=int(0.25*self.sampling_rate), prominence=1.0)
+        return self.detect_ecg_rpeaks_from_z(self.zscore(ecg_f))
+
+    def detect_ecg_rpeaks_from_z(self, ecg_z: np.ndarray) -> np.ndarray:
+        # 이미 z-score 된 입력
+        peaks, _ = find_peaks(ecg_z, distance=int(0.25*self.sampling_rate), prominence=1.0)
         return peaks
 
     def detect_ppg_peaks(self, ppg_f: np.ndarray) -> np.ndarray:
-        z = self.zscore(ppg_f)
-        peaks, _ = find_peaks(z, distance=int(0.3*self.sampling_rate), prominence=0.3)
+        return self.detect_ppg_peaks_from_z(self.zscore(ppg_f))
+
+    def detect_ppg_peaks_from_z(self, ppg_z: np.ndarray) -> np.ndarray:
+        # 이미 z-score 된 입력
+        peaks, _ = find_peaks(ppg_z, distance=int(0.3*self.sampling_rate), prominence=0.3)
         return peaks
 
     def compute_hr(self, peak_indices: np.ndarray) -> Tuple[Optional[float], Optional[float], Optional[float]]:
@@ -98,33 +188,47 @@ class SyncAnalyzer:
         # ECG R-peak 이후에 가장 가까운 PPG peak와 매칭
         if len(r_idx) == 0 or len(ppg_idx) == 0:
             return np.array([])
-        ptts = []
-        j = 0
-        for r in r_idx:
-            while j < len(ppg_idx) and ppg_idx[j] < r:
-                j += 1
-            if j < len(ppg_idx):
-                ptt_s = (ppg_idx[j] - r) / self.sampling_rate
-                if 0.0 < ptt_s < 1.5:  # 합리적 범위
-                    ptts.append(ptt_s)
-        return np.array(ptts)
+        if HAVE_NUMBA:
+            return _map_ptt(
+                np.ascontiguousarray(r_idx, dtype=np.int64),
+                np.ascontiguousarray(ppg_idx, dtype=np.int64),
+                float(self.sampling_rate),
+            )
+        # Numba 없을 때: 정렬된 ppg_idx에서 각 R 이후 첫 PPG peak를 searchsorted로 일괄 탐색
+        r_idx = np.asarray(r_idx)
+        ppg_idx = np.asarray(ppg_idx)
+        j = np.searchsorted(ppg_idx, r_idx, side='left')
+        valid = j < ppg_idx.size
+        ptt = (ppg_idx[j[valid]] - r_idx[valid]) / self.sampling_rate
+        return ptt[(ptt > 0.0) & (ptt < 1.5)]  # 합리적 범위
 
     def delay_by_xcorr(self, x: np.ndarray, y: np.ndarray) -> float:
         # y가 x 대비 얼마나 뒤로(+) 밀려 있는지 추정 (샘플 단위)
-        x0 = self.zscore(x)
-        y0 = self.zscore(y)
-        corr = np.correlate(y0, x0, mode='full')
-        lag = np.argmax(corr) - (len(x0) - 1)
-        return lag / self.sampling_rate
+        return self.delay_by_xcorr_from_z(self.zscore(x), self.zscore(y))
+
+    def delay_by_xcorr_from_z(self, x0: np.ndarray, y0: np.ndarray) -> float:
+        # 이미 z-score 된 입력
+        x0 = x0.astype(self.dtype, copy=False)
+        y0 = y0.astype(self.dtype, copy=False)
+        # method='auto': 긴 ROI는 FFT(O(N log N)), 짧은 ROI는 direct
+        corr = correlate(y0, x0, mode='full', method='auto')
+        lags = correlation_lags(len(y0), len(x0), mode='full')
+        return lags[np.argmax(corr)] / self.sampling_rate
 
     # ----------------- SQI -----------------
     def compute_sqi(self, x: np.ndarray) -> Dict[str, float]:
         # 매우 간단한 SQI: 포화율, 플랫율, SNR-ish
-        x = np.asarray(x)
-        rng = np.max(x) - np.min(x) + 1e-9
-        sat = np.mean((x > (np.max(x) - 0.01*rng)) | (x < (np.min(x) + 0.01*rng)))
-        flat = np.mean(np.abs(np.diff(x)) < 1e-4)
-        snr_like = (np.var(x) / (np.mean(np.abs(np.diff(x))) + 1e-9))
+        # min/max, |diff| 는 한 번만 계산해서 재사용 (배열 순회 횟수 최소화)
+        # 임계값은 극값과의 거리로 비교 (float32에서 mx - 0.01*rng 가 mx로 반올림되는 문제 방지)
+        x = np.ascontiguousarray(x)
+        mn = x.min()
+        mx = x.max()
+        tol = 0.01 * (float(mx) - float(mn) + 1e-9)
+        sat = np.count_nonzero(((mx - x) < tol) | ((x - mn) < tol)) / x.size
+        d = np.abs(np.diff(x))
+        flat = np.count_nonzero(d < 1e-4) / max(d.size, 1)
+        md = float(d.mean(dtype=np.float64)) if d.size else 0.0
+        snr_like = float(x.var(dtype=np.float64)) / (md + 1e-9)
         return {"saturation": float(sat), "flatness": float(flat), "snr_like": float(snr_like)}
 
     # ----------------- end-to-end ROI analysis -----------------
@@ -134,7 +238,8 @@ class SyncAnalyzer:
         ppg: np.ndarray,
         ecg: np.ndarray,
         do_detrend: bool = True,
-        filt_mode: str = "default"
+        filt_mode: str = "default",
+        fast: bool = False
     ) -> ROIResult:
         if self.roi_start is None or self.roi_end is None:
             raise ValueError("ROI가 설정되지 않았습니다.")
@@ -144,29 +249,54 @@ class SyncAnalyzer:
         ecg_roi = self.extract_roi(ecg)
         t_roi = self.extract_roi(t)
 
+        # SciPy 필터가 strided view를 내부 복사하지 않도록 연속 배열 보장 (이미 연속이면 복사 없음)
+        ppg_roi = np.ascontiguousarray(ppg_roi, dtype=self.dtype)
+        ecg_roi = np.ascontiguousarray(ecg_roi, dtype=self.dtype)
+
+        if fast:
+            # 빠른 미리보기: detrend/필터/피크/SQI 생략, raw 신호 z-score 교차상관 지연만
+            ppg_cut, ecg_cut = self.align_signals(
+                self._zscore_into(ppg_roi, "ppg_z"), self._zscore_into(ecg_roi, "ecg_z")
+            )
+            delay_s = self.delay_by_xcorr_from_z(ecg_cut, ppg_cut)  # +면 PPG가 뒤
+            return ROIResult(
+                start_s=self.roi_start,
+                end_s=self.roi_end,
+                n_samples=len(t_roi),
+                fs=self.sampling_rate,
+                hr_bpm=None,
+                rr_mean_s=None,
+                rr_sd_s=None,
+                ptt_mean_s=None,
+                ptt_sd_s=None,
+                delay_xcorr_s=float(delay_s),
+                sqi={}
+            )
+
         # 2) 전처리
+        filt_ecg = filt_mode in ("default", "ppg_ecg")
+        filt_ppg = filt_mode in ("default", "ppg_ecg", "ppg_only")
+
         if do_detrend:
-            ppg_roi = self.detrend(ppg_roi)
-            ecg_roi = self.detrend(ecg_roi)
-
-        if filt_mode == "default" or filt_mode == "ppg_ecg":
-            # ECG: 5~15 Hz (아주 간단)
-            ecg_f = self.bandpass(ecg_roi, 5.0, 15.0)
-            # PPG: 0.5~5 Hz
-            ppg_f = self.bandpass(ppg_roi, 0.5, 5.0)
-        elif filt_mode == "ppg_only":
-            ecg_f = ecg_roi
-            ppg_f = self.bandpass(ppg_roi, 0.5, 5.0)
-        elif filt_mode == "off":
-            ecg_f = ecg_roi
-            ppg_f = ppg_roi
-        else:
-            ecg_f = ecg_roi
-            ppg_f = ppg_roi
+            # 대역통과의 high-pass 차단(PPG 0.5 Hz / ECG 5 Hz)이 선형 추세를 제거하므로
+            # 필터링되는 신호는 detrend 생략 (전체 배열 패스 1회 절약)
+            if filt_ecg or filt_ppg:
+                _log_detrend_skip_once()
+            if not filt_ppg:
+                ppg_roi = self._detrend_into(ppg_roi, "ppg_detrend")
+            if not filt_ecg:
+                ecg_roi = self._detrend_into(ecg_roi, "ecg_detrend")
+
+        # ECG: 5~15 Hz (아주 간단)
+        ecg_f = self.bandpass(ecg_roi, 5.0, 15.0) if filt_ecg else ecg_roi
+        # PPG: 0.5~5 Hz
+        ppg_f = self.bandpass(ppg_roi, 0.5, 5.0) if filt_ppg else ppg_roi
 
-        # 3) 피크 탐지/지표
-        r_idx = self.detect_ecg_rpeaks(ecg_f)
-        ppg_pk = self.detect_ppg_peaks(ppg_f)
+        # 3) 피크 탐지/지표 (z-score는 한 번만 계산해서 피크/교차상관에 공용)
+        ppg_z = self._zscore_into(ppg_f, "ppg_z")
+        ecg_z = self._zscore_into(ecg_f, "ecg_z")
+        r_idx = self.detect_ecg_rpeaks_from_z(ecg_z)
+        ppg_pk = self.detect_ppg_peaks_from_z(ppg_z)
 
         hr_bpm, rr_mean_s, rr_sd_s = self.compute_hr(r_idx)
         ptt_arr = self.map_ptt(r_idx, ppg_pk)
@@ -174,8 +304,8 @@ class SyncAnalyzer:
         ptt_sd_s = float(np.std(ptt_arr)) if len(ptt_arr) else None
 
         # 4) 교차상관 기반 지연 추정
-        ppg_cut, ecg_cut = self.align_signals(ppg_f, ecg_f)
-        delay_s = self.delay_by_xcorr(ecg_cut, ppg_cut)  # +면 PPG가 뒤
+        ppg_cut, ecg_cut = self.align_signals(ppg_z, ecg_z)
+        delay_s = self.delay_by_xcorr_from_z(ecg_cut, ppg_cut)  # +면 PPG가 뒤
 
         # 5) SQI
         sqi = self.compute_sqi(ppg_f)
@@ -191,5 +321,7 @@ class SyncAnalyzer:
             ptt_mean_s=ptt_mean_s,
             ptt_sd_s=ptt_sd_s,
             delay_xcorr_s=float(delay_s),
-            sqi=sqi
+            sqi=sqi,
+            ppg_peaks=ppg_pk,
+            ecg_peaks=r_idx
         )
@@ -2,11 +2,11 @@
 import numpy as np
 import pandas as pd
 from PySide6.QtWidgets import QFileDialog, QMessageBox
-from scipy.signal import find_peaks
 
 class AnalyzeExportMixin:
     """
     - ROI 분석(HR/PTT/Delay)
+    - ROI 드래그 중 빠른 미리보기(Delay만)
     - ROI CSV 내보내기
     이 Mixin은 다음 속성들이 self에 있다고 가정:
       analyzer, t, ppg, ecg, spin_fs, combo_filter, chk_detrend,
@@ -35,16 +35,12 @@ class AnalyzeExportMixin:
             QMessageBox.critical(self, "분석 실패", str(e))
             return
 
-        # ROI 피크 표시 (표시용 간단 탐지)
-        fs = res.fs
-        s_idx = int(res.start_s * fs)
-        e_idx = int(res.end_s * fs)
-        t_roi = self.t[s_idx:e_idx]
-        ppg_roi = self.ppg[s_idx:e_idx]
-        ecg_roi = self.ecg[s_idx:e_idx]
-
-        p_pg, _ = find_peaks(ppg_roi, distance=int(0.3 * fs))
-        p_ecg, _ = find_peaks(ecg_roi, distance=int(0.25 * fs))
+        # ROI 피크 표시 (분석기에서 필터링 신호로 검출한 ROI 로컬 인덱스 재사용)
+        t_roi = self.analyzer.extract_roi(self.t)
+        ppg_roi = self.analyzer.extract_roi(self.ppg)
+        ecg_roi = self.analyzer.extract_roi(self.ecg)
+        p_pg = res.ppg_peaks
+        p_ecg = res.ecg_peaks
         self.plot_ppg.show_peaks(t_roi[p_pg], ppg_roi[p_pg])
         self.plot_ecg.show_peaks(t_roi[p_ecg], ecg_roi[p_ecg])
 
@@ -58,6 +54,25 @@ class AnalyzeExportMixin:
         ]
         self._update_status(" | ".join(txt))
 
+    def preview_roi(self, region):
+        # ROI 드래그 중 호출: 전처리 없이 xcorr 지연만 계산, 실패해도 대화상자 없이 무시
+        if any(getattr(self, k) is None for k in ["t", "ppg", "ecg"]):
+            return
+        start, end = region
+        if end <= start:
+            return
+        self.analyzer.set_sampling_rate(self.spin_fs.value())
+        self.analyzer.set_roi(start, end)
+        try:
+            res = self.analyzer.analyze_roi(self.t, self.ppg, self.ecg, fast=True)
+        except Exception:
+            self._update_status(f"ROI {start:.2f}~{end:.2f}s")
+            return
+        self._update_status(
+            f"ROI {res.start_s:.2f}~{res.end_s:.2f}s | N={res.n_samples} | "
+            f"Delay(xcorr, fast) = {res.delay_xcorr_s:.4f}s"
+        )
+
     def export_roi_csv(self):
         if any(getattr(self, k) is None for k in ["t", "ppg", "ecg"]):
             QMessageBox.warning(self, "안내", "데이터를 먼저 로드하세요.")
@@ -70,8 +85,9 @@ class AnalyzeExportMixin:
 
         start, end = roi
         fs = self.spin_fs.value()
-        s_idx = int(start * fs)
-        e_idx = int(end * fs)
+        t0 = self.analyzer.time_origin
+        s_idx = int((start - t0) * fs)
+        e_idx = int((end - t0) * fs)
         s_idx = max(0, s_idx)
         e_idx = min(len(self.t), e_idx)
 
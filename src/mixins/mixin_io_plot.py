@@ -1,8 +1,32 @@
 # mixin_io_plot.py
 import pandas as pd
 from PySide6.QtWidgets import QFileDialog, QMessageBox, QApplication
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
 from pyqtgraph.exporters import ImageExporter
 
+
+class _PngSignals(QObject):
+    # (path, error) : error가 빈 문자열이면 성공
+    finished = Signal(str, str)
+
+
+class _PngSaveTask(QRunnable):
+    """렌더링된 QImage의 PNG 인코딩/저장을 워커 스레드에서 수행"""
+    def __init__(self, image, path: str, signals: _PngSignals):
+        super().__init__()
+        self.setAutoDelete(False)  # 참조는 mixin이 보관 (완료 시 해제)
+        self.image = image
+        self.path = path
+        self.signals = signals
+
+    def run(self):
+        try:
+            ok = self.image.save(self.path, "PNG")
+            self.signals.finished.emit(self.path, "" if ok else f"이미지 저장 실패: {self.path}")
+        except Exception as e:
+            self.signals.finished.emit(self.path, str(e))
+
+
 class IOPlotMixin:
     """
     - 상태표시/FS설정
@@ -11,6 +35,8 @@ class IOPlotMixin:
     - PNG 저장
     이 Mixin은 다음 속성들이 self에 있다고 가정:
       loader, analyzer, spin_fs, plot_ppg, plot_ecg, label_status
+      chk_partial_csv, spin_load_from, spin_load_to
+      region_ppg, region_ecg (선택, 로드 후 ROI를 데이터 구간으로 이동)
       t, ppg, ecg
     """
 
@@ -24,6 +50,31 @@ class IOPlotMixin:
         self.loader.sampling_rate = fs
         self.analyzer.set_sampling_rate(fs)
 
+    def _set_data(self, t, ppg, ecg, fs: float):
+        self.t, self.ppg, self.ecg = t, ppg, ecg
+        self._set_fs(fs)
+        self.analyzer.set_time_origin(t[0] if len(t) else 0.0)
+        self._plot_all()
+        self._fit_roi_to_data()
+
+    def _fit_roi_to_data(self):
+        # 기존 ROI가 로드된 시간 구간과 겹치지 않으면 [t0, t0+2s]로 이동 (부분 로드/타임스탬프 CSV)
+        region_ppg = getattr(self, "region_ppg", None)
+        if region_ppg is None or self.t is None or len(self.t) == 0:
+            return
+        t0, t1 = float(self.t[0]), float(self.t[-1])
+        start, end = region_ppg.getRegion()
+        if end > t0 and start < t1:
+            return
+        new_region = (t0, min(t0 + 2.0, t1))
+        self._region_sync_lock = True
+        try:
+            region_ppg.setRegion(new_region)
+            if getattr(self, "region_ecg", None) is not None:
+                self.region_ecg.setRegion(new_region)
+        finally:
+            self._region_sync_lock = False
+
     # ----- 플롯 -----
     def _plot_all(self):
         if self.t is None:
@@ -40,9 +91,7 @@ class IOPlotMixin:
             return
         try:
             t, ppg, ecg, fs = self.loader.load_mat(path)
-            self.t, self.ppg, self.ecg = t, ppg, ecg
-            self._set_fs(fs)
-            self._plot_all()
+            self._set_data(t, ppg, ecg, fs)
             self._update_status(f"MAT 로드 완료 | fs={fs:.2f} Hz | N={len(t)}")
         except Exception as e:
             QMessageBox.critical(self, "로드 실패", str(e))
@@ -52,33 +101,74 @@ class IOPlotMixin:
         if not path:
             return
         try:
-            t, ppg, ecg, fs = self.loader.load_csv(path)
-            self.t, self.ppg, self.ecg = t, ppg, ecg
-            self._set_fs(fs)
-            self._plot_all()
+            time_range = None
+            if self.chk_partial_csv.isChecked():
+                # 지정 구간만 로드 (대용량 CSV)
+                time_range = (self.spin_load_from.value(), self.spin_load_to.value())
+            t, ppg, ecg, fs = self.loader.load_csv(path, time_range=time_range)
+            self._set_data(t, ppg, ecg, fs)
             self._update_status(f"CSV 로드 완료 | fs≈{fs:.2f} Hz | N={len(t)}")
         except Exception as e:
             QMessageBox.critical(self, "로드 실패", str(e))
 
     def load_dummy(self):
         t, ppg, ecg, fs = self.loader.generate_dummy(duration=15, fs=self.spin_fs.value())
-        self.t, self.ppg, self.ecg = t, ppg, ecg
-        self._set_fs(fs)
-        self._plot_all()
+        self._set_data(t, ppg, ecg, fs)
         self._update_status(f"더미 데이터 로드 완료 | fs={fs:.2f} Hz | N={len(t)}")
 
     # ----- PNG 저장 -----
     def save_plots_png(self):
+        # 이전 저장 작업이 끝나기 전에는 무시 (실행 중인 task 참조/카운터 보호)
+        if getattr(self, "_png_remaining", 0) > 0:
+            self._update_status("이전 플롯 저장이 진행 중입니다.")
+            return
+
         path, _ = QFileDialog.getSaveFileName(self, "Save Plots PNG", "plots.png", "PNG Image (*.png)")
         if not path:
             return
+        if not path.lower().endswith(".png"):
+            path += ".png"
+        base = path[:-len(".png")]
+
+        targets = [
+            (self.plot_ppg, base + "_ppg.png"),
+            (self.plot_ecg, base + "_ecg.png"),
+        ]
 
-        QApplication.processEvents()
-        exporter1 = ImageExporter(self.plot_ppg.plotItem)
-        exporter2 = ImageExporter(self.plot_ecg.plotItem)
+        # 씬 렌더링은 GUI 스레드에서, PNG 인코딩/파일 쓰기는 QThreadPool에서 병렬 처리
+        if getattr(self, "_png_signals", None) is None:
+            self._png_signals = _PngSignals()
+            self._png_signals.finished.connect(self._on_png_saved)
+        self._png_tasks = []
+        self._png_errors = []
+        self._png_paths = [p for _, p in targets]
+        # 렌더링 중 processEvents로 재진입해도 무시되도록 먼저 카운터 설정
+        self._png_remaining = len(targets)
         try:
-            exporter1.export(path.replace(".png", "_ppg.png"))
-            exporter2.export(path.replace(".png", "_ecg.png"))
-            self._update_status(f"플롯 저장 완료: {path.replace('.png', '_ppg.png')}, {path.replace('.png', '_ecg.png')}")
+            for plot, target_path in targets:
+                QApplication.processEvents()
+                image = ImageExporter(plot.plotItem).export(toBytes=True)
+                self._png_tasks.append(_PngSaveTask(image, target_path, self._png_signals))
         except Exception as e:
+            self._png_tasks = []
+            self._png_remaining = 0
             QMessageBox.critical(self, "저장 실패", str(e))
+            return
+
+        pool = QThreadPool.globalInstance()
+        for task in self._png_tasks:
+            pool.start(task)
+
+    def _on_png_saved(self, target_path: str, error: str):
+        # 워커 스레드 signal → GUI 스레드에서 호출 (queued)
+        if error:
+            self._png_errors.append(error)
+        self._png_remaining -= 1
+        if self._png_remaining > 0:
+            return
+        # 모든 task의 완료 signal을 받은 뒤에만 참조 해제
+        self._png_tasks = []
+        if self._png_errors:
+            QMessageBox.critical(self, "저장 실패", "\n".join(self._png_errors))
+        else:
+            self._update_status(f"플롯 저장 완료: {', '.join(self._png_paths)}")
@@ -1,21 +1,38 @@
 # mixin_roi_sync.py
 from typing import Tuple
+from PySide6.QtCore import QTimer
 
 class ROISyncMixin:
     """
     - 두 Plot에 별도의 ROI 생성
     - ROI 상호 동기화 (무한루프 방지 락)
     - X축 동기화
+    - 드래그 중 연속 이벤트는 16ms(≈60Hz) 단위로 최신 값만 처리 (throttle)
     - 상태표시 헬퍼(_roi_changed)
     이 Mixin은 다음 속성들이 self에 있다고 가정:
       plot_ppg, plot_ecg : GraphWidget
       label_status       : QLabel
       t                  : np.ndarray | None
+      chk_fast_preview   : QCheckBox (선택, 체크 시 preview_roi 호출)
     """
 
     def _init_roi_sync(self):
         # ROI 생성 및 양방향 동기화
         self._region_sync_lock = False
+        self._xrange_sync_lock = False
+        self._pending_region = None   # (region, target_region)
+        self._pending_xrange = None   # (source, target)
+
+        self._roi_timer = QTimer(self)
+        self._roi_timer.setSingleShot(True)
+        self._roi_timer.setInterval(16)
+        self._roi_timer.timeout.connect(self._flush_roi_change)
+
+        self._xrange_timer = QTimer(self)
+        self._xrange_timer.setSingleShot(True)
+        self._xrange_timer.setInterval(16)
+        self._xrange_timer.timeout.connect(self._flush_xrange_change)
+
         self.region_ppg = self.plot_ppg.add_roi_region(start=2, end=4, on_change=self._on_region_change_from_ppg)
         self.region_ecg = self.plot_ecg.add_roi_region(start=2, end=4, on_change=self._on_region_change_from_ecg)
 
@@ -27,21 +44,30 @@ class ROISyncMixin:
     def _on_region_change_from_ppg(self, region: Tuple[float, float]):
         if self._region_sync_lock:
             return
-        self._region_sync_lock = True
-        try:
-            if self.region_ecg is not None:
-                self.region_ecg.setRegion(region)
-            self._roi_changed(region)
-        finally:
-            self._region_sync_lock = False
+        self._pending_region = (region, self.region_ecg)
+        self._arm_timer(self._roi_timer)
 
     def _on_region_change_from_ecg(self, region: Tuple[float, float]):
         if self._region_sync_lock:
             return
+        self._pending_region = (region, self.region_ppg)
+        self._arm_timer(self._roi_timer)
+
+    @staticmethod
+    def _arm_timer(timer):
+        # 실행 중인 타이머는 재시작하지 않음 → 드래그 중에도 16ms마다 최신 값으로 flush (throttle)
+        if not timer.isActive():
+            timer.start()
+
+    def _flush_roi_change(self):
+        if self._pending_region is None:
+            return
+        region, target = self._pending_region
+        self._pending_region = None
         self._region_sync_lock = True
         try:
-            if self.region_ppg is not None:
-                self.region_ppg.setRegion(region)
+            if target is not None:
+                target.setRegion(region)
             self._roi_changed(region)
         finally:
             self._region_sync_lock = False
@@ -50,13 +76,30 @@ class ROISyncMixin:
     def _roi_changed(self, region: Tuple[float, float]):
         if getattr(self, "t", None) is None:
             return
+        if getattr(self, "chk_fast_preview", None) is not None and self.chk_fast_preview.isChecked():
+            self.preview_roi(region)
+            return
         start, end = region
         self.label_status.setText(f"ROI {start:.2f}~{end:.2f}s")
         self.label_status.repaint()
 
     def sync_graphs(self, source, target):
-        x_range = source.viewRange()[0]
-        target.setXRange(x_range[0], x_range[1], padding=0)
+        if self._xrange_sync_lock:
+            return
+        self._pending_xrange = (source, target)
+        self._arm_timer(self._xrange_timer)
+
+    def _flush_xrange_change(self):
+        if self._pending_xrange is None:
+            return
+        source, target = self._pending_xrange
+        self._pending_xrange = None
+        self._xrange_sync_lock = True
+        try:
+            x_range = source.viewRange()[0]
+            target.setXRange(x_range[0], x_range[1], padding=0)
+        finally:
+            self._xrange_sync_lock = False
 
     def get_current_roi(self):
         return self.region_ppg.getRegion() if getattr(self, "region_ppg", None) else None
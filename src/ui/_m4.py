@@ -0,0 +1,68 @@
+# _m4.py
+# M4 집계(픽셀 bin별 first/min/max/last) 다운샘플링
+# Numba 미설치 시 HAVE_NUMBA=False → GraphWidget은 pyqtgraph 'peak' 다운샘플링 사용
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _emit(x, y, out_x, out_y, k, i_first, i_min, i_max, i_last):
+        # bin 내 대표점 4개를 시간 순서대로, 중복 인덱스는 제외하고 기록
+        lo = min(i_min, i_max)
+        hi = max(i_min, i_max)
+        prev = -1
+        for i in (i_first, lo, hi, i_last):
+            if i != prev:
+                out_x[k] = x[i]
+                out_y[k] = y[i]
+                k += 1
+                prev = i
+        return k
+
+    @njit(cache=True)
+    def _m4_kernel(x, y, x_min, x_max, n_pixels):
+        out_x = np.empty(4 * n_pixels, dtype=np.float64)
+        out_y = np.empty(4 * n_pixels, dtype=np.float64)
+        scale = n_pixels / (x_max - x_min)
+        k = 0
+        cur = -1
+        i_first = i_min = i_max = i_last = 0
+        for i in range(x.size):
+            b = int((x[i] - x_min) * scale)
+            if b < 0:
+                b = 0
+            elif b >= n_pixels:
+                b = n_pixels - 1
+            if b != cur:
+                if cur >= 0:
+                    k = _emit(x, y, out_x, out_y, k, i_first, i_min, i_max, i_last)
+                cur = b
+                i_first = i_min = i_max = i_last = i
+            else:
+                if y[i] < y[i_min]:
+                    i_min = i
+                if y[i] > y[i_max]:
+                    i_max = i
+                i_last = i
+        if cur >= 0:
+            k = _emit(x, y, out_x, out_y, k, i_first, i_min, i_max, i_last)
+        return out_x[:k], out_y[:k]
+
+
+def m4_downsample(x: np.ndarray, y: np.ndarray, x_min: float, x_max: float, n_pixels: int):
+    """정렬된 x 기준으로 [x_min, x_max] 구간을 n_pixels bin으로 M4 집계 (경계 바깥 1샘플 포함)"""
+    if x_max <= x_min or n_pixels <= 0:
+        return x, y
+    i0 = max(int(np.searchsorted(x, x_min, side='left')) - 1, 0)
+    i1 = min(int(np.searchsorted(x, x_max, side='right')) + 1, len(x))
+    return _m4_kernel(
+        np.ascontiguousarray(x[i0:i1], dtype=np.float64),
+        np.ascontiguousarray(y[i0:i1]),
+        float(x_min), float(x_max), int(n_pixels),
+    )
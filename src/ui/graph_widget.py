@@ -1,27 +1,94 @@
 # graph_widget.py
+import numpy as np
 import pyqtgraph as pg
 from typing import Optional, Iterable
+from _m4 import HAVE_NUMBA, m4_downsample
+
+# 대용량 trace 렌더링: PyOpenGL이 있으면 OpenGL 경로 사용 (위젯 생성 전에 설정해야 함)
+try:
+    import OpenGL  # noqa: F401
+    pg.setConfigOption('useOpenGL', True)
+    pg.setConfigOption('enableExperimental', True)
+    pg.setConfigOption('antialias', False)
+except ImportError:
+    pass
+
+class _M4CurveItem(pg.PlotDataItem):
+    """M4로 축소된 구간만 그리되, autoRange(View All)용 범위는 원본 전체 기준으로 보고"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.raw_x: Optional[np.ndarray] = None
+        self.raw_y: Optional[np.ndarray] = None
+        self._raw_y_bounds = (None, None)
+
+    def set_raw(self, x: np.ndarray, y: np.ndarray):
+        self.raw_x, self.raw_y = x, y
+        self._raw_y_bounds = (float(np.nanmin(y)), float(np.nanmax(y))) if len(y) else (None, None)
+
+    def dataBounds(self, ax, frac=1.0, orthoRange=None):
+        x, y = self.raw_x, self.raw_y
+        if x is None or len(x) == 0:
+            return super().dataBounds(ax, frac, orthoRange)
+        if ax == 0:
+            # x(시간)는 정렬되어 있음
+            return float(x[0]), float(x[-1])
+        if orthoRange is None:
+            return self._raw_y_bounds
+        # 보이는 x 구간의 원본 y 범위
+        i0 = int(np.searchsorted(x, orthoRange[0], side='left'))
+        i1 = int(np.searchsorted(x, orthoRange[1], side='right'))
+        if i1 <= i0:
+            return None, None
+        seg = y[i0:i1]
+        return float(np.nanmin(seg)), float(np.nanmax(seg))
+
 
 class GraphWidget(pg.PlotWidget):
     def __init__(self, title="Signal", color="w"):
         super().__init__(title=title)
         self.showGrid(x=True, y=True, alpha=0.3)
         self.setBackground('k')
-        self.curve = self.plot(pen=color)
+        self.curve = _M4CurveItem(pen=color)
+        self.addItem(self.curve)
         self.region: Optional[pg.LinearRegionItem] = None
         self.cross_v = pg.InfiniteLine(angle=90, movable=False, pen=pg.mkPen('#777'))
         self.addItem(self.cross_v, ignoreBounds=True)
         self.scatter: Optional[pg.ScatterPlotItem] = None
+        self._raw_x: Optional[np.ndarray] = None
+        self._raw_y: Optional[np.ndarray] = None
 
-        # 성능 향상
-        self.getPlotItem().setDownsampling(mode='peak')
+        # 성능 향상: Numba가 있으면 M4 집계, 없으면 pyqtgraph 'peak' 다운샘플링
+        if HAVE_NUMBA:
+            self.getPlotItem().setDownsampling(ds=1, auto=False)
+            self.sigXRangeChanged.connect(self._refresh_curve)
+            self.getViewBox().sigResized.connect(self._refresh_curve)
+        else:
+            self.getPlotItem().setDownsampling(mode='peak')
         self.getPlotItem().setClipToView(True)
 
         # 마우스 이동 십자선
         self.scene().sigMouseMoved.connect(self._on_mouse_moved)
 
     def plot_data(self, x, y):
-        self.curve.setData(x, y)
+        self._raw_x = np.asarray(x)
+        self._raw_y = np.asarray(y)
+        if HAVE_NUMBA:
+            # 축소 데이터를 그려도 autoRange는 원본 전체 범위를 사용
+            self.curve.set_raw(self._raw_x, self._raw_y)
+        self._refresh_curve()
+
+    def _refresh_curve(self, *args):
+        """보이는 X 구간을 픽셀 폭 기준 M4로 줄여서 curve 갱신 (N <= 4·W 이면 원본)"""
+        x, y = self._raw_x, self._raw_y
+        if x is None:
+            return
+        n_px = int(self.getViewBox().width())
+        if not HAVE_NUMBA or n_px <= 0 or len(x) <= 4 * n_px:
+            self.curve.setData(x, y)
+            return
+        x_min, x_max = self.viewRange()[0]
+        xs, ys = m4_downsample(x, y, x_min, x_max, n_px)
+        self.curve.setData(xs, ys)
 
     def add_roi_region(self, start=2, end=4, on_change=None):
         """ROI 선택 영역 추가. on_change: 콜백(region.getRegion())"""
@@ -47,10 +114,13 @@ class GraphWidget(pg.PlotWidget):
         return None
 
     def show_peaks(self, x_vals: Iterable[float], y_vals: Iterable[float]):
-        """피크 마커 표시"""
-        if self.scatter:
-            self.removeItem(self.scatter)
-        self.scatter = pg.ScatterPlotItem(x=list(x_vals), y=list(y_vals), size=6)
+        """피크 마커 표시 (기존 ScatterPlotItem이 있으면 setData로 재사용)"""
+        xa = np.asarray(x_vals, dtype=np.float64)
+        ya = np.asarray(y_vals, dtype=np.float64)
+        if self.scatter is not None:
+            self.scatter.setData(x=xa, y=ya, size=6)
+            return
+        self.scatter = pg.ScatterPlotItem(x=xa, y=ya, size=6, pxMode=True, useCache=True)
         self.addItem(self.scatter)
 
     def clear_peaks(self):
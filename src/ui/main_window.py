@@ -41,6 +41,23 @@ class ROISyncApp(QWidget, ROISyncMixin, IOPlotMixin, AnalyzeExportMixin):
         ctrl.addWidget(self.btn_load_csv)
         ctrl.addWidget(self.btn_load_dummy)
 
+        # 대용량 CSV 부분 로드 (지정 구간 행만 읽음)
+        self.chk_partial_csv = QCheckBox("Partial CSV")
+        ctrl.addWidget(self.chk_partial_csv)
+        self.spin_load_from = QDoubleSpinBox()
+        self.spin_load_from.setRange(0, 1e7)
+        self.spin_load_from.setDecimals(2)
+        self.spin_load_from.setSuffix(" s")
+        self.spin_load_from.setValue(0.0)
+        ctrl.addWidget(self.spin_load_from)
+        ctrl.addWidget(QLabel("~"))
+        self.spin_load_to = QDoubleSpinBox()
+        self.spin_load_to.setRange(0, 1e7)
+        self.spin_load_to.setDecimals(2)
+        self.spin_load_to.setSuffix(" s")
+        self.spin_load_to.setValue(60.0)
+        ctrl.addWidget(self.spin_load_to)
+
         ctrl.addWidget(QLabel("Fs(Hz):"))
         self.spin_fs = QDoubleSpinBox()
         self.spin_fs.setRange(10, 2000)
@@ -57,6 +74,10 @@ class ROISyncApp(QWidget, ROISyncMixin, IOPlotMixin, AnalyzeExportMixin):
         self.chk_detrend.setChecked(True)
         ctrl.addWidget(self.chk_detrend)
 
+        # ROI 드래그 시 Delay만 빠르게 계산
+        self.chk_fast_preview = QCheckBox("Fast preview")
+        ctrl.addWidget(self.chk_fast_preview)
+
         self.btn_analyze = QPushButton("Analyze ROI (HR/PTT/Delay)")
         ctrl.addWidget(self.btn_analyze)
 
@@ -0,0 +1,111 @@
+# test_sync_analyzer.py
+# float32 처리 경로가 float64 기준과 ROI 지표에서 1e-4 상대오차 이내로 일치하는지 확인
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "core"))
+
+from data_loader import DataLoader  # noqa: E402
+from sync_analyzer import _ZSCORE_JIT_MIN, SyncAnalyzer  # noqa: E402
+
+REL_TOL = 1e-4
+FS = 128.0
+
+
+def _dummy(offset: float = 0.0, duration: float = 30):
+    np.random.seed(0)
+    t, ppg, ecg, fs = DataLoader().generate_dummy(duration=duration, fs=FS)
+    return t, ppg + np.float32(offset), ecg + np.float32(offset), fs
+
+
+def _analyze(dtype, t, ppg, ecg, fs, roi=(2.0, 20.0), **kwargs):
+    analyzer = SyncAnalyzer(fs, dtype=dtype)
+    analyzer.set_roi(*roi)
+    return analyzer.analyze_roi(t, ppg, ecg, **kwargs)
+
+
+def _assert_close(a, b):
+    if a is None or b is None:
+        assert a is None and b is None
+    else:
+        assert a == pytest.approx(b, rel=REL_TOL, abs=1e-12)
+
+
+@pytest.mark.parametrize("filt_mode", ["default", "ppg_only", "off"])
+@pytest.mark.parametrize("do_detrend", [True, False])
+@pytest.mark.parametrize("offset", [0.0, 1000.0])
+def test_float32_matches_float64(filt_mode, do_detrend, offset):
+    t, ppg, ecg, fs = _dummy(offset)
+    r64 = _analyze(np.float64, t, ppg, ecg, fs, do_detrend=do_detrend, filt_mode=filt_mode)
+    r32 = _analyze(np.float32, t, ppg, ecg, fs, do_detrend=do_detrend, filt_mode=filt_mode)
+
+    for name in ("hr_bpm", "rr_mean_s", "rr_sd_s", "ptt_mean_s", "ptt_sd_s", "delay_xcorr_s"):
+        _assert_close(getattr(r32, name), getattr(r64, name))
+    assert r32.sqi.keys() == r64.sqi.keys()
+    for k in r64.sqi:
+        _assert_close(r32.sqi[k], r64.sqi[k])
+    np.testing.assert_array_equal(r32.ppg_peaks, r64.ppg_peaks)
+    np.testing.assert_array_equal(r32.ecg_peaks, r64.ecg_peaks)
+
+
+def test_fast_delay_matches_float64():
+    t, ppg, ecg, fs = _dummy()
+    r64 = _analyze(np.float64, t, ppg, ecg, fs, fast=True)
+    r32 = _analyze(np.float32, t, ppg, ecg, fs, fast=True)
+    _assert_close(r32.delay_xcorr_s, r64.delay_xcorr_s)
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_long_roi_float32_matches_float64(fast):
+    # ROI 0~59 s(7552샘플) > _ZSCORE_JIT_MIN → Numba 설치 시 Welford 커널 경로
+    t, ppg, ecg, fs = _dummy(1000.0, duration=60)
+    assert int(59.0 * fs) > _ZSCORE_JIT_MIN
+    r64 = _analyze(np.float64, t, ppg, ecg, fs, roi=(0.0, 59.0), fast=fast)
+    r32 = _analyze(np.float32, t, ppg, ecg, fs, roi=(0.0, 59.0), fast=fast)
+    names = ("delay_xcorr_s",) if fast else ("hr_bpm", "rr_mean_s", "rr_sd_s", "ptt_mean_s", "ptt_sd_s", "delay_xcorr_s")
+    for name in names:
+        _assert_close(getattr(r32, name), getattr(r64, name))
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+@pytest.mark.parametrize("offset", [0.0, 1000.0])
+def test_zscore_long_matches_numpy(dtype, offset):
+    rng = np.random.default_rng(0)
+    x = (rng.standard_normal(10_000) * 3.0 + offset).astype(dtype)
+    assert x.size > _ZSCORE_JIT_MIN
+    x64 = x.astype(np.float64)
+    ref = (x64 - x64.mean()) / x64.std()
+    analyzer = SyncAnalyzer(FS, dtype=dtype)
+    x_before = x.copy()
+    for z in (analyzer.zscore(x), analyzer._zscore_into(x, "z")):
+        assert z.dtype == dtype
+        np.testing.assert_allclose(z, ref, rtol=0, atol=1e-5)
+    np.testing.assert_array_equal(x, x_before)  # zscore는 입력 보존
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_sqi_constant_signal(dtype):
+    sqi = SyncAnalyzer(FS, dtype=dtype).compute_sqi(np.full(256, 0.75, dtype=dtype))
+    assert sqi["saturation"] == 1.0
+    assert sqi["flatness"] == 1.0
+
+
+def test_extract_roi_before_time_origin_raises():
+    # 부분 로드(origin 10 s) 후 기본 ROI 2~4 s: 음수 인덱스로 대부분을 잘라내지 않고 오류
+    analyzer = SyncAnalyzer(FS)
+    analyzer.set_time_origin(10.0)
+    analyzer.set_roi(2.0, 4.0)
+    with pytest.raises(ValueError):
+        analyzer.extract_roi(np.zeros(int(30 * FS)))
+
+
+def test_extract_roi_is_relative_to_time_origin():
+    analyzer = SyncAnalyzer(FS)
+    analyzer.set_time_origin(10.0)
+    analyzer.set_roi(11.0, 12.0)
+    x = np.arange(int(30 * FS))
+    roi = analyzer.extract_roi(x)
+    assert roi[0] == int(FS) and len(roi) == int(FS)